@@ -0,0 +1,64 @@
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from detection import ParticleAnalyzer, ParticleData
+
+
+def analyze_particles_per_label(analyzer, markers, color):
+    # Reference implementation: one full-frame mask and findContours call per label
+    particles = []
+    for label in range(2, markers.max() + 1):
+        mask = np.zeros(markers.shape, dtype=np.uint8)
+        mask[markers == label] = 255
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+        if contours:
+            contour = contours[0]
+            area = cv2.contourArea(contour)
+            if analyzer.min_size < area < analyzer.max_size:
+                (x, y), radius = cv2.minEnclosingCircle(contour)
+                particles.append(ParticleData(int(x), int(y), area, color, int(radius)))
+
+    return particles
+
+
+def synthetic_markers(count, width=1280, height=720, seed=0):
+    # Watershed-style marker image: -1 border, 1 background, one label per bead from 2 upwards
+    rng = np.random.default_rng(seed)
+    markers = np.ones((height, width), dtype=np.int32)
+    for label in range(2, count + 2):
+        x = int(rng.integers(10, width - 10))
+        y = int(rng.integers(10, height - 10))
+        radius = int(rng.integers(4, 10))
+        cv2.circle(markers, (x, y), radius, label, -1)
+        cv2.circle(markers, (x, y), radius, -1, 1)
+    markers[0, :] = markers[-1, :] = markers[:, 0] = markers[:, -1] = -1
+    return markers
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main(counts=(10, 100, 1000), repeat=5):
+    analyzer = ParticleAnalyzer()
+    print(f"{'particles':>10} {'per-label (ms)':>16} {'single-pass (ms)':>18} {'speedup':>9}")
+    for count in counts:
+        markers = synthetic_markers(count)
+        loop_time, expected = best_of(lambda: analyze_particles_per_label(analyzer, markers, 'red'), repeat)
+        fast_time, actual = best_of(lambda: analyzer.analyze_particles(markers, 'red'), repeat)
+        if actual != expected:
+            raise AssertionError(f"Results differ at {count} particles")
+        print(f"{count:>10} {loop_time * 1000:>16.2f} {fast_time * 1000:>18.2f} {loop_time / fast_time:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or (10, 100, 1000))
@@ -0,0 +1,206 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+from pipeline import PipelineStats
+
+
+class PIDController:
+    def __init__(self, kp, ki, kd):
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.prev_error = 0
+        self.integral = 0
+
+    def compute(self, setpoint, current_value, dt):
+        error = setpoint - current_value
+        self.integral += error * dt
+        derivative = (error - self.prev_error) / dt if dt > 0 else 0
+        output = self.kp * error + self.ki * self.integral + self.kd * derivative
+        self.prev_error = error
+        return output
+
+    def reset(self):
+        self.prev_error = 0
+        self.integral = 0
+
+
+@dataclass
+class Measurement:
+    value: float
+    timestamp: float
+    sequence: int
+
+
+class MagnetDriver:
+    UP_CHANNEL = 4
+    BOTTOM_CHANNEL = 7
+    MAX_VOLTAGE = 2.28
+    MAX_AMP = 3
+
+    def __init__(self, set_voltage, tolerance=0.001):
+        self.set_voltage = set_voltage
+        self.tolerance = tolerance
+        self.enabled = True
+        self.last_voltage = None
+        self._lock = threading.Lock()
+
+    def apply(self, strength):
+        # Writes both magnet channels for a strength in [-1, 1]. Returns False when the driver is disabled
+        # or the voltage is within tolerance of the last write, so redundant DAQ calls are skipped.
+        up_voltage = max(-1, min(1, strength)) * self.MAX_VOLTAGE
+        with self._lock:
+            if not self.enabled:
+                return False
+            if self.last_voltage is not None and abs(up_voltage - self.last_voltage) < self.tolerance:
+                return False
+            self._write(up_voltage)
+        logging.info(f'Magnet strength adjusted: Up = {up_voltage}V, Bottom = {-up_voltage}V')
+        return True
+
+    def set_enabled(self, enabled):
+        with self._lock:
+            self.enabled = enabled
+            if not enabled:
+                self._write(0)
+
+    def zero(self):
+        with self._lock:
+            self._write(0)
+
+    def set_voltages(self, up_voltage, bottom_voltage):
+        # Manual writes from outside the control loop. All writes to the magnet channels go through the driver
+        # so last_voltage always matches the hardware.
+        with self._lock:
+            self._write(up_voltage, bottom_voltage)
+
+    def _write(self, up_voltage, bottom_voltage=None):
+        bottom_voltage = -up_voltage if bottom_voltage is None else bottom_voltage
+        self.last_voltage = None  # Unknown output until both channels are written
+        self.set_voltage(self.UP_CHANNEL, up_voltage)
+        self.set_voltage(self.BOTTOM_CHANNEL, bottom_voltage)
+        if bottom_voltage == -up_voltage:  # apply() only ever produces symmetric outputs
+            self.last_voltage = up_voltage
+
+
+class ControlLoop:
+    """Runs the PID magnet control on its own thread at a fixed period, independent of the frame rate.
+
+    Measurements are submitted from any thread; each tick consumes only a measurement newer than the last
+    one used and younger than max_age, and the PID dt is the time between the frames those measurements
+    came from. A gap longer than max_age between two used measurements resets the PID. on_update(setpoint, value, output, amp) and on_error(message) are called from the loop thread.
+    """
+
+    def __init__(self, pid, driver, period=0.1, max_age=0.5, stats=None):
+        self.pid = pid
+        self.driver = driver
+        self.period = period
+        self.max_age = max_age
+        self.stats = stats or PipelineStats()
+        self.setpoint = 0.5
+        self.on_update = None
+        self.on_error = None
+        self.max_jitter_ms = 0.0
+        self._lock = threading.Lock()
+        self._measurement = None
+        self._sequence = 0
+        self._last_used = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def submit(self, value, timestamp):
+        with self._lock:
+            self._sequence += 1
+            self._measurement = Measurement(value, timestamp, self._sequence)
+
+    def set_setpoint(self, setpoint):
+        self.setpoint = setpoint
+
+    def set_active(self, active):
+        self.driver.set_enabled(active)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="vantage-control", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def take_fresh_measurement(self, now):
+        with self._lock:
+            measurement = self._measurement
+        if measurement is None or (self._last_used and measurement.sequence == self._last_used.sequence):
+            return None
+        if now - measurement.timestamp > self.max_age:
+            self.stats.count('stale_measurements')
+            return None
+        return measurement
+
+    def step(self, now):
+        measurement = self.take_fresh_measurement(now)
+        if measurement is None:
+            self.stats.count('idle_ticks')
+            return None
+
+        if self._last_used is None:
+            dt = self.period
+        elif measurement.timestamp - self._last_used.timestamp > self.max_age:
+            # First measurement after a gap (no particles, stale frames): restart the PID instead of
+            # integrating the whole gap into one step
+            self.pid.reset()
+            self.stats.count('gaps')
+            dt = self.period
+        else:
+            dt = measurement.timestamp - self._last_used.timestamp
+        self._last_used = measurement
+        self.stats.record('measurement_dt', dt * 1000)
+
+        output = self.pid.compute(self.setpoint, measurement.value, dt)
+        strength = max(-1, min(1, output))
+
+        start = time.perf_counter()
+        try:
+            written = self.driver.apply(strength)
+        except Exception as e:
+            logging.error(f"Error adjusting magnet strength: {e}")
+            self.stats.count('write_failed')
+            if self.on_error:
+                self.on_error(str(e))
+            return output
+        if written:
+            self.stats.record('actuation', (time.perf_counter() - start) * 1000)
+            self.stats.count('writes')
+        else:
+            self.stats.count('writes_skipped')
+
+        if self.on_update:
+            self.on_update(self.setpoint, measurement.value, output, strength * self.driver.MAX_AMP)
+        return output
+
+    def _run(self):
+        next_tick = time.perf_counter() + self.period
+        while not self._stop.is_set():
+            remaining = next_tick - time.perf_counter()
+            if remaining > 0 and self._stop.wait(remaining):
+                break
+
+            now = time.perf_counter()
+            jitter_ms = (now - next_tick) * 1000
+            self.stats.record('jitter', jitter_ms)
+            self.max_jitter_ms = max(self.max_jitter_ms, jitter_ms)
+
+            next_tick += self.period
+            if next_tick < now:
+                # Overran by more than a period: resynchronise instead of firing a burst of catch-up ticks
+                self.stats.count('overruns')
+                next_tick = now + self.period
+
+            self.step(now)
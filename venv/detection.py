@@ -0,0 +1,304 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+
+def merge_windows(windows):
+    # Merge overlapping (x0, y0, x1, y1) windows so no particle is segmented twice
+    windows = list(windows)
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(windows)):
+            for j in range(i + 1, len(windows)):
+                a, b = windows[i], windows[j]
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    windows[i] = (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+                    del windows[j]
+                    merged = True
+                    break
+            if merged:
+                break
+
+    return windows
+
+
+class StageProfiler:
+    # Accumulates wall time per detection stage; disabled profilers cost one attribute check per stage
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.totals_ms = {}
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self.totals_ms[name] = self.totals_ms.get(name, 0.0) + elapsed
+
+    def reset(self):
+        with self._lock:
+            self.totals_ms = {}
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.totals_ms)
+
+
+@dataclass
+class ParticleData:
+    x: int
+    y: int
+    size: float
+    color: str
+    radius: int
+    track_id: int = -1
+
+
+class ParticleAnalyzer:
+    def __init__(self, min_size=30, max_size=600, threshold=20, profiler=None):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.threshold = threshold
+        self.profiler = profiler or StageProfiler()
+        self.roi_rects = []
+        self.roi_only = False
+        self.roi_margin = 20
+        self.downscale = 0
+
+    def set_size_range(self, min_size, max_size):
+        self.min_size = min_size
+        self.max_size = max_size
+
+    def set_detection_mode(self, roi_only, roi_margin, downscale):
+        self.roi_only = roi_only
+        self.roi_margin = roi_margin
+        self.downscale = downscale
+
+    def set_roi_rects(self, rects):
+        # Rects are (x, y, width, height) in full-frame coordinates
+        self.roi_rects = list(rects)
+
+    def find_particles(self, frame, color, windows=None):
+        # Segments only the detection windows (whole frame, ROIs plus margin, or the (x0, y0, x1, y1) windows given),
+        # optionally on a pyramid-downscaled copy, and maps the results back to full-frame coordinates and sizes.
+        downscale = self.downscale
+        windows = self._detection_windows(frame.shape) if windows is None else merge_windows(windows)
+        particles = []
+        for x0, y0, x1, y1 in windows:
+            window = frame[y0:y1, x0:x1]
+            with self.profiler.stage('pyramid'):
+                for _ in range(downscale):
+                    window = cv2.pyrDown(window)
+            markers = self.detect_particles(window)
+            with self.profiler.stage('analysis'):
+                particles.extend(self.analyze_particles(markers, color, offset=(x0, y0), scale=2 ** downscale))
+
+        return particles
+
+    def _detection_windows(self, shape):
+        height, width = shape[:2]
+        rects, margin = self.roi_rects, self.roi_margin
+        if not self.roi_only or not rects:
+            return [(0, 0, width, height)]
+
+        windows = []
+        for x, y, w, h in rects:
+            x0, y0 = max(x - margin, 0), max(y - margin, 0)
+            x1, y1 = min(x + w + margin, width), min(y + h + margin, height)
+            if x1 > x0 and y1 > y0:
+                windows.append((x0, y0, x1, y1))
+
+        return merge_windows(windows)
+
+    def detect_particles(self, frame):
+        profiler = self.profiler
+        with profiler.stage('clahe'):
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            enhanced = self._enhance_image(gray)
+        with profiler.stage('threshold'):
+            binary = self._create_binary_image(enhanced)
+
+        # Apply distance transform
+        with profiler.stage('distance_transform'):
+            dist_transform = cv2.distanceTransform(binary, cv2.DIST_L2, 5)
+            _, sure_fg = cv2.threshold(dist_transform, 0.7 * dist_transform.max(), 255, 0)
+
+            # Find unknown region
+            sure_fg = np.uint8(sure_fg)
+            unknown = cv2.subtract(binary, sure_fg)
+
+        # Marker labelling
+        with profiler.stage('markers'):
+            _, markers = cv2.connectedComponents(sure_fg)
+            markers = markers + 1
+            markers[unknown == 255] = 0
+
+        # Apply watershed
+        with profiler.stage('watershed'):
+            markers = cv2.watershed(frame, markers)
+
+        return markers
+
+    def _enhance_image(self, gray):
+        blurred = cv2.GaussianBlur(gray, (7, 7), 0)
+        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+        return clahe.apply(blurred)
+
+    def _create_binary_image(self, enhanced):
+        _, binary = cv2.threshold(enhanced, self.threshold, 255, cv2.THRESH_BINARY)
+        kernel = np.ones((3, 3), np.uint8)
+        binary = cv2.morphologyEx(binary, cv2.MORPH_OPEN, kernel)
+        return cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel)
+
+    def analyze_particles(self, markers, color, offset=(0, 0), scale=1):
+        # offset and scale map marker coordinates from a cropped or downscaled window back to the full frame
+        particles = []
+        height, width = markers.shape
+        offset_x, offset_y = offset
+        area_scale = scale * scale
+
+        for label, y0, y1, x0, x1 in zip(*self._label_boxes(markers)):
+            # A contour through pixel centres can never enclose more than its bounding box
+            if (y1 - y0 - 1) * (x1 - x0 - 1) * area_scale <= self.min_size:
+                continue
+
+            # Pad by one pixel so findContours sees the same neighbourhood as on the full frame
+            y0, y1 = max(y0 - 1, 0), min(y1 + 1, height)
+            x0, x1 = max(x0 - 1, 0), min(x1 + 1, width)
+
+            mask = np.uint8(markers[y0:y1, x0:x1] == label) * 255
+            contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE, offset=(x0, y0))
+
+            if contours:
+                contour = contours[0]
+                area = cv2.contourArea(contour) * area_scale
+                if self.min_size < area < self.max_size:
+                    (x, y), radius = cv2.minEnclosingCircle(contour)
+                    particles.append(ParticleData(int(x * scale + offset_x), int(y * scale + offset_y), area, color,
+                                                  int(radius * scale)))
+
+        return particles
+
+    @staticmethod
+    def _label_boxes(markers):
+        # Bounding boxes of every particle label (2 and up) from a single pass over the marker image:
+        # gather foreground pixels, group them by label and reduce each group to its min/max row and column.
+        ys, xs = np.nonzero(markers > 1)
+        if not len(ys):
+            return [], [], [], [], []
+
+        labels = markers[ys, xs]
+        order = np.argsort(labels, kind='stable')
+        labels, ys, xs = labels[order], ys[order], xs[order]
+        starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+
+        return (labels[starts].tolist(),
+                np.minimum.reduceat(ys, starts).tolist(),
+                (np.maximum.reduceat(ys, starts) + 1).tolist(),
+                np.minimum.reduceat(xs, starts).tolist(),
+                (np.maximum.reduceat(xs, starts) + 1).tolist())
+
+
+class ColorDetector:
+    def __init__(self, initial_value):
+        self.set_threshold(initial_value)
+
+    def set_threshold(self, value):
+        hue = int(value * 1.79)
+        self.lower_threshold = np.array([max(0, hue - 20), 50, 50])
+        self.upper_threshold = np.array([min(179, hue + 20), 255, 255])
+
+    def detect(self, frame, color):
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        return self.detect_hsv(frame, hsv)
+
+    def detect_hsv(self, frame, hsv):
+        mask = cv2.inRange(hsv, self.lower_threshold, self.upper_threshold)
+        return cv2.bitwise_and(frame, frame, mask=mask)
+
+
+@dataclass
+class ColorChannel:
+    name: str
+    detector: ColorDetector
+    analyzer: ParticleAnalyzer
+
+
+@dataclass
+class ColorDetection:
+    masked_frame: object
+    particles: list
+
+
+class MultiColorDetector:
+    def __init__(self, max_workers=None, profiler=None):
+        self.channels = {}
+        self.max_workers = max_workers
+        self.profiler = profiler or StageProfiler()
+        self._executor = None
+
+    def add_color(self, name, initial_value=0, min_size=30, max_size=600):
+        channel = ColorChannel(name, ColorDetector(initial_value),
+                               ParticleAnalyzer(min_size, max_size, profiler=self.profiler))
+        self.channels[name] = channel
+        return channel
+
+    def remove_color(self, name):
+        self.channels.pop(name, None)
+
+    def set_size_range(self, min_size, max_size):
+        for channel in self.channels.values():
+            channel.analyzer.set_size_range(min_size, max_size)
+
+    def set_detection_mode(self, roi_only, roi_margin, downscale):
+        for channel in self.channels.values():
+            channel.analyzer.set_detection_mode(roi_only, roi_margin, downscale)
+
+    def set_roi_rects(self, rects):
+        for channel in self.channels.values():
+            channel.analyzer.set_roi_rects(rects)
+
+    def process(self, frame, windows=None):
+        # HSV conversion is shared by every color; segmentation then runs per color on the pool,
+        # which scales because OpenCV releases the GIL inside its calls.
+        # windows optionally maps a color name to the windows it should be segmented in this frame.
+        with self.profiler.stage('hsv'):
+            hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        windows = windows or {}
+        channels = list(self.channels.values())
+        if len(channels) == 1:
+            channel = channels[0]
+            return {channel.name: self._process_channel(channel, frame, hsv, windows.get(channel.name))}
+
+        executor = self._get_executor()
+        futures = [(channel.name, executor.submit(self._process_channel, channel, frame, hsv, windows.get(channel.name)))
+                   for channel in channels]
+        return {name: future.result() for name, future in futures}
+
+    def shutdown(self):
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="vantage-color")
+        return self._executor
+
+    def _process_channel(self, channel, frame, hsv, windows=None):
+        with self.profiler.stage('mask'):
+            masked_frame = channel.detector.detect_hsv(frame, hsv)
+        return ColorDetection(masked_frame, channel.analyzer.find_particles(masked_frame, channel.name, windows))
@@ -0,0 +1,170 @@
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+
+@dataclass
+class FramePacket:
+    index: int
+    frame: object
+    captured_at: float
+
+
+@dataclass
+class PipelineResult:
+    index: int
+    frame: object
+    detections: object
+    captured_at: float
+    finished_at: float
+    timings: dict = field(default_factory=dict)
+    annotations: dict = field(default_factory=dict)  # Per-frame data added by on_result handlers
+
+
+class PipelineStats:
+    def __init__(self, smoothing=0.1):
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.latency_ms = {}
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record(self, stage, ms):
+        # Exponential moving average so one slow frame does not dominate the readout
+        with self._lock:
+            previous = self.latency_ms.get(stage)
+            self.latency_ms[stage] = ms if previous is None else previous + self.smoothing * (ms - previous)
+
+    def snapshot(self):
+        with self._lock:
+            return {'counters': dict(self.counters), 'latency_ms': dict(self.latency_ms)}
+
+
+class FrameRing:
+    """Bounded frame buffer: a full ring overwrites its oldest frame and readers only ever get the newest one."""
+
+    def __init__(self, capacity=2, stats=None):
+        self._frames = deque(maxlen=capacity)
+        self._condition = threading.Condition()
+        self._closed = False
+        self.stats = stats or PipelineStats()
+
+    def put(self, packet):
+        with self._condition:
+            if len(self._frames) == self._frames.maxlen:
+                self.stats.count('dropped_overwritten')
+            self._frames.append(packet)
+            self._condition.notify()
+
+    def take_latest(self, timeout=None):
+        with self._condition:
+            if not self._frames and not self._closed:
+                self._condition.wait(timeout)
+            if not self._frames:
+                return None
+            packet = self._frames.pop()
+            if self._frames:
+                self.stats.count('dropped_stale', len(self._frames))
+                self._frames.clear()
+            return packet
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class DetectionPipeline:
+    """Runs frame capture and detection on two background threads.
+
+    read_frame() returns the next frame or None, detect(frame) returns the detections for it and
+    on_result(PipelineResult) is called from the detection thread for every processed frame.
+    Detection always works on the newest captured frame; anything older is dropped and counted.
+    """
+
+    def __init__(self, read_frame, detect, on_result, capacity=2, stats=None):
+        self.read_frame = read_frame
+        self.detect = detect
+        self.on_result = on_result
+        self.capacity = capacity
+        self.stats = stats or PipelineStats()
+        self.ring = FrameRing(capacity, self.stats)
+        self._running = threading.Event()
+        self._threads = []
+        self._last_finished = None
+
+    @property
+    def running(self):
+        return self._running.is_set()
+
+    def start(self):
+        if self.running:
+            return
+        self._running.set()
+        self.ring = FrameRing(self.capacity, self.stats)
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="vantage-capture", daemon=True),
+            threading.Thread(target=self._detection_loop, name="vantage-detection", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout=1.0):
+        self._running.clear()
+        self.ring.close()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout)
+        self._threads = []
+
+    def _capture_loop(self):
+        index = 0
+        while self.running:
+            start = time.perf_counter()
+            try:
+                frame = self.read_frame()
+            except Exception as e:
+                logging.error(f"Frame capture failed: {e}")
+                frame = None
+
+            if frame is None:
+                self.stats.count('capture_failed')
+                time.sleep(0.01)  # Camera not ready, avoid spinning
+                continue
+
+            now = time.perf_counter()
+            self.stats.record('capture', (now - start) * 1000)
+            self.stats.count('captured')
+            self.ring.put(FramePacket(index, frame, now))
+            index += 1
+
+    def _detection_loop(self):
+        while self.running:
+            packet = self.ring.take_latest(timeout=0.1)
+            if packet is None:
+                continue
+
+            start = time.perf_counter()
+            try:
+                detections = self.detect(packet.frame)
+            except Exception as e:
+                logging.error(f"Detection failed on frame {packet.index}: {e}")
+                self.stats.count('detection_failed')
+                continue
+            finished = time.perf_counter()
+
+            timings = {'queue': (start - packet.captured_at) * 1000, 'detect': (finished - start) * 1000}
+            for stage, ms in timings.items():
+                self.stats.record(stage, ms)
+            if self._last_finished is not None:
+                self.stats.record('interval', (finished - self._last_finished) * 1000)
+            self._last_finished = finished
+            self.stats.count('processed')
+
+            self.on_result(PipelineResult(packet.index, packet.frame, detections, packet.captured_at, finished,
+                                          timings))
@@ -0,0 +1,149 @@
+import glob
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+PARTICLE_DTYPE = np.dtype([('timestamp', 'f8'), ('frame', 'i8'), ('track_id', 'i4'), ('x', 'i4'), ('y', 'i4'),
+                           ('size', 'f4'), ('radius', 'i4'), ('color', 'u1')])
+ROI_DTYPE = np.dtype([('timestamp', 'f8'), ('frame', 'i8'), ('green', 'i4'), ('red', 'i4'), ('error', 'i4')])
+CONTROL_DTYPE = np.dtype([('timestamp', 'f8'), ('setpoint', 'f4'), ('height', 'f4'), ('output', 'f4'),
+                          ('amp', 'f4')])
+TABLES = {'particles': PARTICLE_DTYPE, 'rois': ROI_DTYPE, 'control': CONTROL_DTYPE}
+
+
+class RunRecorder:
+    """Writes per-frame particles, ROI counts and PID values of a run to NumPy chunk files.
+
+    The record_* methods only put a reference on a queue, so they are safe to call from the detection,
+    control and GUI threads without adding latency; rows are built and written on a background thread.
+    Each table is stored as <table>_<chunk>.npy structured arrays, timestamps are seconds since the
+    recording started and colors are indices into the 'colors' list in meta.json.
+    """
+
+    def __init__(self, directory, colors=('red', 'green'), capture_frames=False, frame_interval=1,
+                 chunk_size=4096, max_pending_frames=8, metadata=None):
+        self.directory = directory
+        self.colors = list(colors)
+        self.capture_frames = capture_frames
+        self.frame_interval = max(1, frame_interval)
+        self.chunk_size = chunk_size
+        self.max_pending_frames = max_pending_frames
+        self.metadata = metadata or {}
+        self.dropped_frames = 0
+        self.origin = None
+        self._queue = queue.SimpleQueue()
+        self._rows = {table: [] for table in TABLES}
+        self._chunks = {table: 0 for table in TABLES}
+        self._pending_frames = 0
+        self._frame_lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        self.origin = time.perf_counter()
+        os.makedirs(self.directory, exist_ok=True)
+        if self.capture_frames:
+            os.makedirs(os.path.join(self.directory, 'frames'), exist_ok=True)
+        self.metadata = dict(self.metadata, started_at=time.time(), chunk_size=self.chunk_size,
+                             capture_frames=self.capture_frames, frame_interval=self.frame_interval)
+        self._write_meta()
+
+        self._thread = threading.Thread(target=self._run, name="vantage-recorder", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def record_particles(self, frame_index, timestamp, particles):
+        self._queue.put(('particles', frame_index, timestamp, particles))
+
+    def record_roi_counts(self, frame_index, timestamp, green_count, red_count, error_count):
+        self._queue.put(('rois', timestamp, frame_index, green_count, red_count, error_count))
+
+    def record_control(self, timestamp, setpoint, height, output, amp):
+        self._queue.put(('control', timestamp, setpoint, height, output, amp))
+
+    def record_frame(self, frame_index, frame):
+        # Frames are dropped rather than queued without bound when encoding falls behind
+        if not self.capture_frames or frame_index % self.frame_interval:
+            return
+        with self._frame_lock:
+            if self._pending_frames >= self.max_pending_frames:
+                self.dropped_frames += 1
+                return
+            self._pending_frames += 1
+        self._queue.put(('frame', frame_index, frame))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            try:
+                self._handle(item)
+            except Exception as e:
+                logging.error(f"Recorder failed to write {item[0]}: {e}")
+        for table in TABLES:
+            self._flush(table)
+        self._write_meta()
+
+    def _handle(self, item):
+        kind = item[0]
+        if kind == 'particles':
+            _, frame_index, timestamp, particles = item
+            timestamp -= self.origin
+            rows = self._rows['particles']
+            for p in particles:
+                rows.append((timestamp, frame_index, p.track_id, p.x, p.y, p.size, p.radius, self._color_code(p.color)))
+        elif kind == 'rois':
+            self._rows['rois'].append((item[1] - self.origin,) + item[2:])
+        elif kind == 'control':
+            self._rows['control'].append((item[1] - self.origin,) + item[2:])
+        elif kind == 'frame':
+            _, frame_index, frame = item
+            with self._frame_lock:
+                self._pending_frames -= 1
+            cv2.imwrite(os.path.join(self.directory, 'frames', f"{frame_index:08d}.png"), frame)
+            return
+
+        if len(self._rows[kind]) >= self.chunk_size:
+            self._flush(kind)
+
+    def _write_meta(self):
+        meta = dict(self.metadata, colors=self.colors, dropped_frames=self.dropped_frames)
+        with open(os.path.join(self.directory, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+    def _color_code(self, color):
+        if color not in self.colors:
+            self.colors.append(color)
+        return self.colors.index(color)
+
+    def _flush(self, table):
+        rows = self._rows[table]
+        if not rows:
+            return
+        np.save(os.path.join(self.directory, f"{table}_{self._chunks[table]:05d}.npy"),
+                np.array(rows, dtype=TABLES[table]))
+        self._chunks[table] += 1
+        self._rows[table] = []
+
+
+def load_recording(directory):
+    # Concatenates the chunk files of every table; returns (meta, {table: structured array})
+    with open(os.path.join(directory, 'meta.json')) as f:
+        meta = json.load(f)
+    tables = {}
+    for table, dtype in TABLES.items():
+        chunks = [np.load(path) for path in sorted(glob.glob(os.path.join(directory, f"{table}_*.npy")))]
+        tables[table] = np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)
+    return meta, tables
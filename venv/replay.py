@@ -0,0 +1,200 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from detection import StageProfiler
+from video_processor import VideoProcessor
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff')
+
+
+class FrameDirectoryCapture:
+    # cv2.VideoCapture stand-in that plays back the images of a directory in file name order
+    def __init__(self, path):
+        self.paths = sorted(os.path.join(path, name) for name in os.listdir(path)
+                            if name.lower().endswith(IMAGE_EXTENSIONS))
+        self.index = 0
+
+    def read(self):
+        while self.index < len(self.paths):
+            frame = cv2.imread(self.paths[self.index])
+            self.index += 1
+            if frame is not None:
+                return True, frame
+        return False, None
+
+    def set(self, prop, value):
+        return False
+
+    def get(self, prop):
+        return len(self.paths) if prop == cv2.CAP_PROP_FRAME_COUNT else 0
+
+    def isOpened(self):
+        return bool(self.paths)
+
+    def release(self):
+        self.index = len(self.paths)
+
+
+class SyntheticBeadCapture:
+    # cv2.VideoCapture stand-in that renders red and green beads drifting and bouncing over a dark background
+    def __init__(self, width=1280, height=720, count=50, frames=300, radius=8, seed=0):
+        rng = np.random.default_rng(seed)
+        self.width = width
+        self.height = height
+        self.frames = frames
+        self.radius = radius
+        self.positions = rng.uniform((radius, radius), (width - radius, height - radius), (count, 2))
+        self.velocities = rng.normal(0, 2, (count, 2))
+        self.colors = [(0, 0, 255) if i % 2 else (0, 255, 0) for i in range(count)]  # BGR red / green
+        self.index = 0
+
+    def read(self):
+        if self.index >= self.frames:
+            return False, None
+
+        frame = np.full((self.height, self.width, 3), 10, dtype=np.uint8)
+        for (x, y), color in zip(self.positions, self.colors):
+            cv2.circle(frame, (int(x), int(y)), self.radius, color, -1)
+
+        self.positions += self.velocities
+        limits = np.array([self.width, self.height]) - self.radius
+        outside = (self.positions < self.radius) | (self.positions > limits)
+        self.velocities[outside] *= -1
+        np.clip(self.positions, self.radius, limits, out=self.positions)
+
+        self.index += 1
+        return True, frame
+
+    def set(self, prop, value):
+        return False
+
+    def get(self, prop):
+        return self.frames if prop == cv2.CAP_PROP_FRAME_COUNT else 0
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        self.index = self.frames
+
+
+def open_capture(source, args):
+    if source == 'synthetic':
+        return SyntheticBeadCapture(args.width, args.height, args.beads, args.frames or 300, seed=args.seed)
+    if os.path.isdir(source):
+        capture = FrameDirectoryCapture(source)
+    else:
+        capture = cv2.VideoCapture(source)
+    if not capture.isOpened():
+        raise SystemExit(f"Could not open replay source: {source}")
+    return capture
+
+
+def apply_project_settings(processor, settings):
+    # Mirrors ColorDetectionApp.load_settings for the parts that affect detection
+    processor.red_detector.set_threshold(settings.get('red_threshold', 20))
+    processor.green_detector.set_threshold(settings.get('green_threshold', 20))
+    processor.color_detector.set_size_range(settings.get('min_particle_size', 30),
+                                            settings.get('max_particle_size', 600))
+    processor.color_detector.set_roi_rects(settings.get('green_boxes', []) + settings.get('red_boxes', []))
+    processor.color_detector.set_detection_mode(settings.get('detection_roi_only', False),
+                                                settings.get('detection_roi_margin', 20),
+                                                settings.get('detection_downscale', 0))
+    processor.full_detection_interval = settings.get('detection_full_interval', 1)
+
+
+def run_replay(processor, profiler, max_frames=None):
+    frames = 0
+    capture_ms = detect_ms = 0.0
+    particles = {name: 0 for name in processor.color_detector.channels}
+
+    profiler.reset()
+    start = time.perf_counter()
+    while max_frames is None or frames < max_frames:
+        read_start = time.perf_counter()
+        frame = processor.read_frame()
+        if frame is None:
+            break
+        detect_start = time.perf_counter()
+        detections = processor.detect(frame)
+        detect_end = time.perf_counter()
+
+        capture_ms += (detect_start - read_start) * 1000
+        detect_ms += (detect_end - detect_start) * 1000
+        for name, detection in detections.items():
+            particles[name] += len(detection.particles)
+        frames += 1
+    elapsed = time.perf_counter() - start
+
+    per_frame = max(frames, 1)
+    return {
+        'frames': frames,
+        'resolution': f"{processor.width}x{processor.height}",
+        'elapsed_s': round(elapsed, 3),
+        'fps': round(frames / elapsed, 2) if elapsed > 0 else 0.0,
+        'capture_ms': round(capture_ms / per_frame, 3),
+        'detect_ms': round(detect_ms / per_frame, 3),
+        # Stage times are summed over colors, so with parallel colors they can exceed detect_ms
+        'stages_ms': {stage: round(total / per_frame, 3) for stage, total in profiler.snapshot().items()},
+        'particles_per_frame': {name: round(count / per_frame, 2) for name, count in particles.items()},
+        'particles_total': particles,
+        'tracks': len(processor.tracker.tracks),
+    }
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Replay recorded or synthetic frames through the VANTAGE "
+                                                 "detection pipeline without a camera or GUI and report timings.")
+    parser.add_argument('source', help="video file, directory of frames, or 'synthetic'")
+    parser.add_argument('--project', help="apply thresholds, sizes, ROIs and detection mode from a .vtp file")
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--height', type=int, default=720)
+    parser.add_argument('--frames', type=int, help="stop after this many frames")
+    parser.add_argument('--red-threshold', type=int, default=4)
+    parser.add_argument('--green-threshold', type=int, default=25)
+    parser.add_argument('--full-detection-interval', type=int,
+                        help="frames between full segmentations while tracking, 1 disables local refinement "
+                             "(default: the project setting, else 1)")
+    parser.add_argument('--beads', type=int, default=50, help="bead count for the synthetic source")
+    parser.add_argument('--seed', type=int, default=0, help="random seed for the synthetic source")
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    profiler = StageProfiler(enabled=True)
+    processor = VideoProcessor(args.source, args.width, args.height, capture=open_capture(args.source, args),
+                               profiler=profiler)
+    processor.red_detector.set_threshold(args.red_threshold)
+    processor.green_detector.set_threshold(args.green_threshold)
+    if args.project:
+        with open(args.project) as f:
+            apply_project_settings(processor, json.load(f))
+    if args.full_detection_interval:
+        processor.full_detection_interval = args.full_detection_interval
+
+    try:
+        report = run_replay(processor, profiler, args.frames)
+    finally:
+        processor.release()
+
+    report['source'] = args.source
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import threading
+from dataclasses import dataclass, field
+
+import numpy as np
+
+ROI_COLORS = ('green', 'red')
+
+
+@dataclass
+class BoxStats:
+    color: str
+    rect: tuple
+    count: int = 0
+    errors: int = 0
+    max_dwell: float = 0.0
+    mean_dwell: float = 0.0
+
+
+@dataclass
+class RoiSummary:
+    green: int = 0
+    red: int = 0
+    error: int = 0
+    boxes: list = field(default_factory=list)
+
+
+class RoiIndex:
+    """Vectorized ROI membership for all particles of a frame.
+
+    The boxes are packed into NumPy arrays once per change (rebuild) so a frame is classified with a single
+    particles x boxes comparison instead of a Python loop over every particle and box. Dwell times follow
+    tracked particles (track_id >= 0) for as long as they stay inside the same box. rebuild and update may
+    be called from different threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.rebuild([], [])
+
+    def rebuild(self, green_rects, red_rects):
+        # Rects are (x, y, width, height) like QRect.getRect(); bounds are inclusive to match QRect.contains
+        rects = list(green_rects) + list(red_rects)
+        box_colors = np.array([0] * len(green_rects) + [1] * len(red_rects), dtype=np.int8)
+        boxes = np.array(rects, dtype=np.int64).reshape(-1, 4)
+        with self._lock:
+            self.rects = rects
+            self.box_colors = box_colors
+            self.x0, self.y0 = boxes[:, 0], boxes[:, 1]
+            self.x1, self.y1 = boxes[:, 0] + boxes[:, 2] - 1, boxes[:, 1] + boxes[:, 3] - 1
+            self._entered = {}
+
+    def membership(self, xs, ys):
+        # Boolean (particles, boxes) matrix of which box contains which particle
+        xs, ys = np.asarray(xs)[:, None], np.asarray(ys)[:, None]
+        return (xs >= self.x0) & (xs <= self.x1) & (ys >= self.y0) & (ys <= self.y1)
+
+    def update(self, particles, timestamp):
+        with self._lock:
+            return self._update(particles, timestamp)
+
+    def _update(self, particles, timestamp):
+        summary = RoiSummary(boxes=[BoxStats(ROI_COLORS[code], rect) for code, rect in zip(self.box_colors, self.rects)])
+        if not particles or not self.rects:
+            self._entered = {}
+            return summary
+
+        xs = np.fromiter((p.x for p in particles), dtype=np.int64, count=len(particles))
+        ys = np.fromiter((p.y for p in particles), dtype=np.int64, count=len(particles))
+        colors = np.fromiter((ROI_COLORS.index(p.color) if p.color in ROI_COLORS else -1 for p in particles),
+                             dtype=np.int8, count=len(particles))
+        inside = self.membership(xs, ys)
+        is_green_box = self.box_colors == 0
+        in_green = inside[:, is_green_box].any(axis=1)
+        in_red = inside[:, ~is_green_box].any(axis=1)
+
+        # Same precedence as the original per-particle checks: a correct green, then a correct red, else an error
+        green = in_green & (colors == 0)
+        red = in_red & (colors == 1) & ~green
+        error = ((in_green & (colors == 1)) | (in_red & (colors == 0))) & ~green & ~red
+        summary.green, summary.red, summary.error = int(green.sum()), int(red.sum()), int(error.sum())
+
+        matches = colors[:, None] == self.box_colors[None, :]
+        counts = (inside & matches).sum(axis=0)
+        errors = (inside & ~matches & (colors[:, None] >= 0)).sum(axis=0)
+
+        entered = {}
+        dwell = [[] for _ in self.rects]
+        for particle_index, box_index in zip(*np.nonzero(inside)):
+            track_id = particles[particle_index].track_id
+            if track_id < 0:
+                continue
+            key = (track_id, int(box_index))
+            entered[key] = self._entered.get(key, timestamp)
+            dwell[box_index].append(timestamp - entered[key])
+        self._entered = entered
+
+        for box, count, error_count, times in zip(summary.boxes, counts, errors, dwell):
+            box.count, box.errors = int(count), int(error_count)
+            if times:
+                box.max_dwell, box.mean_dwell = max(times), sum(times) / len(times)
+        return summary
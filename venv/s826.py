@@ -0,0 +1,34 @@
+from ctypes import *
+import logging
+import os
+import platform
+
+
+if platform.system() == 'Darwin' or os.environ.get('VANTAGE_S826_MOCK'):
+    # Mock backend for machines without the board (macOS, or VANTAGE_S826_MOCK=1 for tests and replays):
+    # remembers the last voltage per channel instead of driving the magnets
+    MOCK_MESSAGE = f"Using {platform.system()}, no S826 board available"
+    channel_voltages = {}
+    # Module logger: logging.warning() here would configure the root logger before main.py sets up its log file
+    logging.getLogger(__name__).warning("S826 mock backend active: magnet voltages are recorded, not output")
+
+    def setChanVolt(chan, volt):
+        channel_voltages[int(chan)] = float(volt)
+        return MOCK_MESSAGE
+
+    def detectBoard():
+        return MOCK_MESSAGE
+else:
+    maindll = cdll.LoadLibrary("./main4.dll")
+    id = maindll.detectBoard()
+    maindll.SetVoltOut.argtypes = [c_int, c_int, c_float]
+
+
+    def setChanVolt(chan, volt):
+        maindll.SetVoltOut(0, int(chan), float(volt))
+
+
+    def detectBoard():
+        return maindll.detectBoard()
+
+
@@ -0,0 +1,106 @@
+import os
+import time
+
+os.environ['VANTAGE_S826_MOCK'] = '1'
+
+import pytest
+
+import s826
+from control import ControlLoop, MagnetDriver, PIDController
+
+
+@pytest.fixture
+def loop():
+    s826.channel_voltages.clear()
+    driver = MagnetDriver(s826.setChanVolt)
+    control_loop = ControlLoop(PIDController(1.0, 0.0, 0.0), driver, period=0.01)
+    yield control_loop
+    control_loop.stop()
+
+
+def test_step_writes_both_channels(loop):
+    loop.submit(0.25, 10.0)
+    output = loop.step(10.0)
+
+    assert output == pytest.approx(0.25)
+    assert s826.channel_voltages[MagnetDriver.UP_CHANNEL] == pytest.approx(0.25 * MagnetDriver.MAX_VOLTAGE)
+    assert s826.channel_voltages[MagnetDriver.BOTTOM_CHANNEL] == pytest.approx(-0.25 * MagnetDriver.MAX_VOLTAGE)
+    assert loop.stats.snapshot()['counters']['writes'] == 1
+
+
+def test_unchanged_output_skips_write(loop):
+    loop.submit(0.25, 10.0)
+    loop.step(10.0)
+    loop.submit(0.25, 10.1)
+    loop.step(10.1)
+
+    counters = loop.stats.snapshot()['counters']
+    assert counters['writes'] == 1
+    assert counters['writes_skipped'] == 1
+
+
+def test_stale_and_reused_measurements_are_ignored(loop):
+    loop.submit(0.25, 10.0)
+    assert loop.step(10.0 + loop.max_age + 0.1) is None
+    loop.submit(0.25, 20.0)
+    loop.step(20.0)
+    assert loop.step(20.01) is None
+
+    counters = loop.stats.snapshot()['counters']
+    assert counters['stale_measurements'] == 1
+    assert counters['idle_ticks'] == 2
+    assert counters['writes'] == 1
+
+
+def test_deactivating_zeroes_and_blocks_writes(loop):
+    loop.submit(0.0, 10.0)
+    loop.step(10.0)
+    loop.set_active(False)
+    assert s826.channel_voltages == {MagnetDriver.UP_CHANNEL: 0.0, MagnetDriver.BOTTOM_CHANNEL: 0.0}
+
+    loop.submit(0.0, 10.1)
+    loop.step(10.1)
+    assert s826.channel_voltages[MagnetDriver.UP_CHANNEL] == 0.0
+    assert loop.stats.snapshot()['counters']['writes_skipped'] == 1
+
+
+def test_manual_write_invalidates_skip(loop):
+    loop.submit(0.25, 10.0)
+    loop.step(10.0)
+    loop.driver.set_voltages(1.0, 0.5)
+    loop.submit(0.25, 10.1)
+    loop.step(10.1)
+
+    assert s826.channel_voltages[MagnetDriver.UP_CHANNEL] == pytest.approx(0.25 * MagnetDriver.MAX_VOLTAGE)
+    assert s826.channel_voltages[MagnetDriver.BOTTOM_CHANNEL] == pytest.approx(-0.25 * MagnetDriver.MAX_VOLTAGE)
+    assert loop.stats.snapshot()['counters']['writes'] == 2
+
+
+def test_loop_thread_drives_magnets(loop):
+    updates = []
+    loop.on_update = lambda setpoint, value, output, amp: updates.append(output)
+    loop.start()
+    loop.submit(0.0, time.perf_counter())
+
+    deadline = time.perf_counter() + 2.0
+    while not updates and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    loop.stop()
+    loop.driver.zero()
+
+    assert updates == [pytest.approx(0.5)]
+    assert s826.channel_voltages == {MagnetDriver.UP_CHANNEL: 0.0, MagnetDriver.BOTTOM_CHANNEL: 0.0}
+
+
+def test_gap_restarts_pid(loop):
+    loop.pid = PIDController(0.0, 1.0, 0.0)
+    loop.submit(0.49, 10.0)
+    loop.step(10.0)
+    loop.submit(0.49, 10.01)
+    loop.step(10.01)
+    loop.submit(0.49, 30.0)
+    output = loop.step(30.0)
+
+    assert output == pytest.approx(0.01 * loop.period)
+    assert loop.stats.snapshot()['counters']['gaps'] == 1
+    assert abs(s826.channel_voltages[MagnetDriver.UP_CHANNEL]) < 0.01
@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from detection import StageProfiler
+from replay import SyntheticBeadCapture, main, run_replay
+from video_processor import VideoProcessor
+
+REPORT_KEYS = {'frames', 'resolution', 'elapsed_s', 'fps', 'capture_ms', 'detect_ms', 'stages_ms',
+               'particles_per_frame', 'particles_total', 'tracks'}
+
+
+@pytest.fixture
+def processor():
+    profiler = StageProfiler(enabled=True)
+    processor = VideoProcessor('synthetic', 1280, 720, capture=SyntheticBeadCapture(count=50, frames=10, seed=0),
+                               profiler=profiler)
+    processor.red_detector.set_threshold(4)
+    processor.green_detector.set_threshold(25)
+    yield processor, profiler
+    processor.release()
+
+
+def test_synthetic_beads_are_detected_per_color(processor):
+    report = run_replay(*processor)
+
+    assert report['frames'] == 10
+    assert report['resolution'] == '1280x720'
+    # Half the beads are red and half green; beads that touch can merge into one particle
+    for color in ('red', 'green'):
+        assert 22 <= report['particles_per_frame'][color] <= 25
+    assert 44 <= report['tracks'] <= 50
+
+
+def test_report_is_written_as_json(tmp_path):
+    output = tmp_path / 'report.json'
+    main(['synthetic', '--frames', '5', '--beads', '10', '--output', str(output)])
+
+    report = json.loads(output.read_text())
+    assert REPORT_KEYS | {'source'} <= set(report)
+    assert report['frames'] == 5
+    assert set(report['particles_total']) == {'red', 'green'}
+    assert {'hsv', 'watershed', 'analysis'} <= set(report['stages_ms'])
@@ -0,0 +1,121 @@
+import math
+from dataclasses import dataclass
+
+
+@dataclass
+class Track:
+    track_id: int
+    color: str
+    x: float
+    y: float
+    radius: int
+    smoothed_y: float
+    last_seen: float
+    vx: float = 0.0
+    vy: float = 0.0
+    hits: int = 1
+    missed: int = 0
+
+
+class ParticleTracker:
+    def __init__(self, max_distance=25, max_missed=5, smoothing=0.3, min_hits=2):
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+        self.smoothing = smoothing
+        self.min_hits = min_hits
+        self.tracks = {}
+        self._next_id = 1
+
+    def reset(self):
+        self.tracks = {}
+
+    def update(self, particles, timestamp):
+        # Greedy nearest-neighbour association between predicted track positions and new detections.
+        # Detections are bucketed on a grid of max_distance cells so each track only looks at 3x3 cells.
+        cell = self.max_distance
+        grid = {}
+        for index, particle in enumerate(particles):
+            grid.setdefault((int(particle.x // cell), int(particle.y // cell)), []).append(index)
+
+        candidates = []
+        for track in self.tracks.values():
+            px, py = self._predict(track, timestamp)
+            cx, cy = int(px // cell), int(py // cell)
+            for gx in (cx - 1, cx, cx + 1):
+                for gy in (cy - 1, cy, cy + 1):
+                    for index in grid.get((gx, gy), ()):
+                        particle = particles[index]
+                        if particle.color != track.color:
+                            continue
+                        distance = math.hypot(particle.x - px, particle.y - py)
+                        if distance <= self.max_distance:
+                            candidates.append((distance, track.track_id, index))
+
+        matched_tracks, matched_particles = set(), set()
+        for _, track_id, index in sorted(candidates):
+            if track_id in matched_tracks or index in matched_particles:
+                continue
+            matched_tracks.add(track_id)
+            matched_particles.add(index)
+            self._correct(self.tracks[track_id], particles[index], timestamp)
+
+        for track_id in list(self.tracks):
+            if track_id not in matched_tracks:
+                track = self.tracks[track_id]
+                track.missed += 1
+                if track.missed > self.max_missed:
+                    del self.tracks[track_id]
+
+        for index, particle in enumerate(particles):
+            if index not in matched_particles:
+                track = Track(self._next_id, particle.color, particle.x, particle.y, particle.radius, particle.y,
+                              timestamp)
+                self.tracks[track.track_id] = track
+                particle.track_id = track.track_id
+                self._next_id += 1
+
+        return self.confirmed_tracks()
+
+    def confirmed_tracks(self):
+        # Tracks seen on at least min_hits frames and present on the latest one
+        return [track for track in self.tracks.values() if track.hits >= self.min_hits and track.missed == 0]
+
+    def has_lost_tracks(self, color):
+        return any(track.missed for track in self.tracks.values() if track.color == color)
+
+    def has_tracks(self, color):
+        return any(track.color == color for track in self.tracks.values())
+
+    def refinement_windows(self, color, shape, timestamp, padding=None):
+        # Local search windows (x0, y0, x1, y1) around the predicted position of every track of this color
+        height, width = shape[:2]
+        padding = self.max_distance if padding is None else padding
+        windows = []
+        for track in self.tracks.values():
+            if track.color != color:
+                continue
+            px, py = self._predict(track, timestamp)
+            reach = track.radius * 2 + padding
+            x0, y0 = max(int(px - reach), 0), max(int(py - reach), 0)
+            x1, y1 = min(int(px + reach) + 1, width), min(int(py + reach) + 1, height)
+            if x1 > x0 and y1 > y0:
+                windows.append((x0, y0, x1, y1))
+        return windows
+
+    @staticmethod
+    def _predict(track, timestamp):
+        dt = timestamp - track.last_seen
+        return track.x + track.vx * dt, track.y + track.vy * dt
+
+    def _correct(self, track, particle, timestamp):
+        dt = timestamp - track.last_seen
+        if dt > 0:
+            vx, vy = (particle.x - track.x) / dt, (particle.y - track.y) / dt
+            track.vx += self.smoothing * (vx - track.vx)
+            track.vy += self.smoothing * (vy - track.vy)
+        track.smoothed_y += self.smoothing * (particle.y - track.smoothed_y)
+        track.x, track.y, track.radius = particle.x, particle.y, particle.radius
+        track.last_seen = timestamp
+        track.hits += 1
+        track.missed = 0
+        particle.track_id = track.track_id
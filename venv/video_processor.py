@@ -0,0 +1,104 @@
+import threading
+import time
+
+import cv2
+
+from detection import MultiColorDetector
+from tracking import ParticleTracker
+
+
+class VideoProcessor:
+    def __init__(self, camera_port, width, height, capture=None, profiler=None):
+        # capture can be any object with the cv2.VideoCapture read/set/release interface (recordings, replays)
+        self.camera_port = camera_port
+        self.width = width
+        self.height = height
+        self.capture_lock = threading.Lock()
+        self._tracking_reset = threading.Event()
+        self.cap = capture if capture is not None else cv2.VideoCapture(self.camera_port)
+        self.set_resolution(width, height)
+        self.color_detector = MultiColorDetector(profiler=profiler)
+        red = self.color_detector.add_color('red')
+        green = self.color_detector.add_color('green')
+        self.red_detector, self.red_analyzer = red.detector, red.analyzer
+        self.green_detector, self.green_analyzer = green.detector, green.analyzer
+        self.tracker = ParticleTracker()
+        # Frames between full segmentations while particles are being tracked. Local refinement only finds
+        # particles that are already tracked, so anything above 1 delays new arrivals until the next full pass.
+        self.full_detection_interval = 1
+        self.frames_since_full_detection = 0
+        self.particle_heights = []
+
+    def set_camera_port(self, camera_port):
+        if camera_port != self.camera_port:
+            with self.capture_lock:
+                self.camera_port = camera_port
+                self.cap.release()
+                self.cap = cv2.VideoCapture(self.camera_port)
+            self.set_resolution(self.width, self.height)
+            self.reset_tracking()
+
+    def set_resolution(self, width, height):
+        if (width, height) != (self.width, self.height):
+            self.reset_tracking()  # Track positions are in the old frame coordinates
+        with self.capture_lock:
+            self.width = width
+            self.height = height
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+
+    def reset_tracking(self):
+        # Safe from any thread: the tracker is only touched by the detection thread, which drops all tracks
+        # before it processes the next frame
+        self._tracking_reset.set()
+
+    def read_frame(self):
+        with self.capture_lock:
+            ret, frame = self.cap.read()
+            width, height = self.width, self.height
+        if not ret:
+            return None
+
+        return cv2.resize(frame, (width, height))
+
+    def detect(self, frame):
+        if self._tracking_reset.is_set():
+            self._tracking_reset.clear()
+            self.tracker.reset()
+            self.frames_since_full_detection = 0
+            self.particle_heights = []
+
+        timestamp = time.perf_counter()
+        detections = self.color_detector.process(frame, self._refinement_windows(frame.shape, timestamp))
+        tracks = self.tracker.update([p for detection in detections.values() for p in detection.particles], timestamp)
+        self.particle_heights = [frame.shape[0] - track.smoothed_y for track in tracks]
+
+        return detections
+
+    def _refinement_windows(self, shape, timestamp):
+        # Between full segmentations each color is only re-segmented around its tracked particles.
+        # A color with no tracks, or one that just lost a track, always gets a full segmentation.
+        self.frames_since_full_detection += 1
+        if self.frames_since_full_detection >= self.full_detection_interval:
+            self.frames_since_full_detection = 0
+            return None
+
+        windows = {}
+        for name in self.color_detector.channels:
+            if self.tracker.has_tracks(name) and not self.tracker.has_lost_tracks(name):
+                windows[name] = self.tracker.refinement_windows(name, shape, timestamp)
+        return windows
+
+    def process_frame(self):
+        frame = self.read_frame()
+        if frame is None:
+            return None, [], []
+
+        detections = self.detect(frame)
+
+        return frame, detections['red'].particles, detections['green'].particles
+
+    def release(self):
+        with self.capture_lock:
+            self.cap.release()
+        self.color_detector.shutdown()